@@ -10,10 +10,14 @@
 # The result is measured using a big-endian classical mapping to recover the sorted output of the quantum circuit.
 
 
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
-from qiskit.visualization import plot_histogram
-import matplotlib.pyplot as plt
+import os
+from collections import Counter
+
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
+
+# QSORT_VERBOSE=1 prints the circuit diagram and shows the histogram
+VERBOSE = os.environ.get("QSORT_VERBOSE") == "1"
 
 # 🧠 Custom comparator: compare q[i] and q[j] using ancilla qubits (anc_notj and anc_cond)
 def compare_and_swap(qc, i, j, anc_notj, anc_cond):
@@ -29,14 +33,30 @@ def compare_and_swap(qc, i, j, anc_notj, anc_cond):
     # Conditional SWAP if i > j
     qc.cswap(anc_cond, i, j)
 
-    # Uncompute
-    qc.ccx(i, anc_notj, anc_cond)
+    # Uncompute anc_notj: a swap leaves q[j] = 1, so NOT q[j] XOR anc_cond is the original NOT q[j]
+    qc.x(j)
     qc.cx(j, anc_notj)
+    qc.x(j)
+    qc.cx(anc_cond, anc_notj)
+
+    # anc_cond cannot be uncomputed: sorting is irreversible, so it keeps the
+    # swap record and each pass needs its own fresh anc_cond
+
+# 🎲 Sample counts from the exact statevector instead of running a simulator job
+def sample_counts(qc, shots):
+    # qargs[k] = qubit measured into classical bit k, so keys keep the circuit's bit order
+    qargs = [0] * qc.num_clbits
+    for inst in qc.data:
+        if inst.operation.name == "measure":
+            qargs[qc.find_bit(inst.clbits[0]).index] = qc.find_bit(inst.qubits[0]).index
+
+    sv = Statevector(qc.remove_final_measurements(inplace=False))
+    return {str(k): int(v) for k, v in sv.sample_counts(shots, qargs=qargs).items()}
 
 # 🧮 Main sorting logic
 def quantum_sort_3pass(input_bits):
     print(f"🚀 Initializing circuit with input bits: {input_bits}")
-    qc = QuantumCircuit(5, 5)  # 3 data + 2 ancilla, all measured
+    qc = QuantumCircuit(7, 3)  # 3 data + anc_notj + one anc_cond per pass; only data is measured
 
     # Load initial bits into q[0], q[1], q[2]
     for idx, bit in enumerate(input_bits):
@@ -45,40 +65,43 @@ def quantum_sort_3pass(input_bits):
 
     # Compare-and-swap passes (bubble sort)
     compare_and_swap(qc, 0, 1, 3, 4)  # Pass 1
-    compare_and_swap(qc, 1, 2, 3, 4)  # Pass 2
-    compare_and_swap(qc, 0, 1, 3, 4)  # Pass 3
+    compare_and_swap(qc, 1, 2, 3, 5)  # Pass 2
+    compare_and_swap(qc, 0, 1, 3, 6)  # Pass 3
 
     qc.barrier()
-    qc.measure([0, 1, 2, 3, 4], [4, 3, 2, 1, 0])  # Big-endian ordering for Qiskit
+    qc.measure([0, 1, 2], [2, 1, 0])  # Big-endian ordering for Qiskit
 
     return qc
 
 # 🧪 Run simulation
 input_bits = [1, 0, 1]
 qc = quantum_sort_3pass(input_bits)
-print("\n🧠 Quantum Circuit:")
-print(qc.draw(output="text"))
+if VERBOSE:
+    print("\n🧠 Quantum Circuit:")
+    print(qc.draw(output="text"))
 
-simulator = AerSimulator()
-compiled = transpile(qc, simulator)
-result = simulator.run(compiled, shots=1024).result()
-counts = result.get_counts()
+counts = sample_counts(qc, shots=1024)
 
 print("\n📊 Sorted result (measured):", counts)
-plot_histogram(counts)
-plt.show()
+if VERBOSE:
+    # Matplotlib is only loaded when the plot is actually wanted
+    from qiskit.visualization import plot_histogram
+    import matplotlib.pyplot as plt
+
+    plot_histogram(counts)
+    plt.show()
 
-# 🔍 Analyze result: Extract bits from correct classical registers (c[4], c[3], c[2]) = q[0], q[1], q[2]
-most_common = max(counts, key=counts.get)  # e.g. '01101'
+# 🔍 Analyze result: Extract bits from classical registers (c[2], c[1], c[0]) = q[0], q[1], q[2]
+most_common = Counter(counts).most_common(1)[0][0]  # e.g. '011'
 print("\n✨ Extracting the Sorted Output")
 print("We only care about the data qubits: q[0], q[1], q[2].")
 print(f"From the string '{most_common}':")
 
-# Correct big-endian extraction from classical bits c[4], c[3], c[2]
+# Big-endian extraction: the string reads c[2] c[1] c[0]
 sorted_q = [
-    int(most_common[4]),  # c[4] = q[0]
-    int(most_common[3]),  # c[3] = q[1]
-    int(most_common[2])   # c[2] = q[2]
+    int(most_common[0]),  # c[2] = q[0]
+    int(most_common[1]),  # c[1] = q[1]
+    int(most_common[2])   # c[0] = q[2]
 ]
 
 print(f"q[0] → {sorted_q[0]}")
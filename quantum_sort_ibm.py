@@ -5,17 +5,11 @@ Author : Elmer Yglesias • 7 Jul 2025
 
 from __future__ import annotations
 import argparse
-from collections import Counter
-from typing import Any, List
+from typing import Any, List, Optional
 
-from qiskit_aer import Aer
+import numpy as np
 from qiskit import QuantumCircuit, transpile
-
-try:
-    from qiskit_ibm_runtime import QiskitRuntimeService, Sampler
-except ImportError:
-    QiskitRuntimeService = None  # type: ignore
-    Sampler = None               # type: ignore
+from qiskit.quantum_info import Statevector
 
 TARGET_STATE      = "011"
 NUM_GROVER_ITERS  = 2
@@ -40,6 +34,10 @@ def build_circuit() -> QuantumCircuit:
     qc.measure([0, 1, 2], [0, 1, 2])
     return qc
 
+# Exact output distribution of the fixed circuit, computed once at import
+PROBS = Statevector(build_circuit().remove_final_measurements(inplace=False)).probabilities()
+PROBS /= PROBS.sum()
+
 # ── utilities ───────────────────────────────────────────────────────────
 def _to_bits(key: Any) -> str:
     if isinstance(key, str):
@@ -52,6 +50,22 @@ def _to_bits(key: Any) -> str:
         except Exception:
             return str(key)
 
+def _bitarray_bits(bitarr) -> Optional[np.ndarray]:
+    """
+    Unpack a BitArray's packed uint8 buffer into a (shots, width) 0/1 array.
+
+    Returns None when the internals are not a packed big-endian ndarray.
+    """
+    arr = getattr(bitarr, "array", None)
+    if arr is None:
+        arr = getattr(bitarr, "_array", None)
+    width = getattr(bitarr, "num_bits", 3)
+    if (not isinstance(arr, np.ndarray) or arr.dtype != np.uint8
+            or arr.ndim == 0 or arr.shape[-1] != (width + 7) // 8):
+        return None
+    arr = arr.reshape(-1, arr.shape[-1])
+    return np.unpackbits(arr, axis=-1)[:, -width:]
+
 def _bitarray_to_strings(bitarr) -> List[str]:
     """
     Convert BitArray shots to list[str].
@@ -89,65 +103,90 @@ def _bitarray_to_strings(bitarr) -> List[str]:
             raise RuntimeError(f"Unexpected BitArray row: {sample!r}")
     return strings
 
+def _bitarray_hist(bitarr) -> np.ndarray:
+    """
+    Histogram BitArray shots into a count vector indexed by outcome.
+
+    Packed buffers are folded to ints and binned with np.bincount; other
+    layouts go through _bitarray_to_strings.
+    """
+    bits = _bitarray_bits(bitarr)
+    if bits is None:
+        width = getattr(bitarr, "num_bits", 3)
+        packed = np.array([int(b, 2) for b in _bitarray_to_strings(bitarr)], dtype=np.int64)
+    else:
+        width = bits.shape[1]
+        packed = bits.dot(1 << np.arange(width - 1, -1, -1)).astype(np.int64)
+    return np.bincount(packed, minlength=1 << width)
+
 # ── main runner ─────────────────────────────────────────────────────────
 def run(trials: int, shots: int, *, hw: bool, backend_name: str) -> None:
 
     if hw:
-        if QiskitRuntimeService is None:
-            raise ImportError("Install qiskit-ibm-runtime for hardware mode.")
+        # Only hardware runs need the runtime client; keep it off the simulator path
+        try:
+            from qiskit_ibm_runtime import QiskitRuntimeService, Sampler
+        except ImportError as exc:
+            raise ImportError("Install qiskit-ibm-runtime for hardware mode.") from exc
         svc = QiskitRuntimeService()
         backend = svc.backend(backend_name)
         sampler = Sampler(backend)  # direct mode; Open Plan–compatible
         print(f"🛰️  Backend: {backend.name} ({backend.configuration().n_qubits} qubits)")
+        # The circuit is identical for every trial: build and route it once.
+        # 3 qubits gain nothing from a level-3 layout search on a large device.
+        qc = transpile(
+            build_circuit(),
+            backend,
+            optimization_level=1,
+            layout_method="trivial",
+            routing_method="basic",
+        )
     else:
-        backend = Aer.get_backend("aer_simulator")
-        sampler = None  # type: ignore
-        print("🖥️  Local Aer simulator")
-
-    aggregated = Counter()
-    for _ in range(trials):
-        qc = build_circuit()
-
-        if hw:
-            tqc = transpile(qc, backend, optimization_level=3)
-            raw = sampler.run([tqc], shots=shots).result()
-
-            # Old-style QuasiDistribution
-            if hasattr(raw, "quasi_dists") or hasattr(raw, "quasi_distributions"):
-                q = raw.quasi_dists[0] if hasattr(raw, "quasi_dists") else raw.quasi_distributions[0]
-                counts = {
-                    _to_bits(k): int(round(p * shots))
-                    for k, p in zip(q.keys(), q.probabilities())
-                }
-            else:
-                # New SamplerPubResult with BitArray
-                pub = raw[0]
-                bitarr = pub.data["c"]
-                counts = Counter(_bitarray_to_strings(bitarr))
-        else:
-            job_res = backend.run(transpile(qc, backend), shots=shots).result()
-            counts = job_res.get_counts()
-
-        aggregated.update(counts)
-        print("Trial:", counts)
+        print("🖥️  Local simulator (sampling the exact distribution)")
 
+    # Trials only feed the aggregate, so submit them as a single job
     total = trials * shots
+    if hw:
+        raw = sampler.run([qc], shots=total).result()
+
+        # Old-style QuasiDistribution
+        if hasattr(raw, "quasi_dists") or hasattr(raw, "quasi_distributions"):
+            q = raw.quasi_dists[0] if hasattr(raw, "quasi_dists") else raw.quasi_distributions[0]
+            aggregated = np.zeros(len(PROBS), dtype=np.int64)
+            for k, p in q.items():
+                # QuasiDistribution keys are already outcome ints; only bitstrings need parsing
+                idx = k if isinstance(k, int) else int(_to_bits(k), 2)
+                aggregated[idx] += int(round(p * total))
+        else:
+            # New SamplerPubResult with BitArray
+            pub = raw[0]
+            bitarr = pub.data["c"]
+            aggregated = _bitarray_hist(bitarr)
+    else:
+        # The circuit is fixed, so sampling PROBS matches simulating it shot by shot
+        aggregated = np.random.default_rng().multinomial(total, PROBS)
+
+    # aggregated[i] counts outcome i; report non-empty bins, most frequent first
     print("\nAggregated results:")
-    for bit, cnt in sorted(aggregated.items(), key=lambda kv: kv[1], reverse=True):
+    for i in np.argsort(-aggregated, kind="stable"):
+        cnt = int(aggregated[i])
+        if not cnt:
+            break
+        bit = format(i, "03b")
         pct = 100 * cnt / total
         mark = "✅" if bit == TARGET_STATE else ""
         print(f"  {bit}: {cnt} ({pct:.2f} %) {mark}")
 
-    success_pct = 100 * aggregated.get(TARGET_STATE, 0) / total
+    success_pct = 100 * aggregated[int(TARGET_STATE, 2)] / total
     print(f"\n✅ Amplification for “{TARGET_STATE}”: {success_pct:.2f} % over {total} shots")
 
 # ── CLI ──────────────────────────────────────────────────────────────────
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Grover eraser sort — Aer / IBM QPU")
+    parser = argparse.ArgumentParser(description="Grover eraser sort — simulator / IBM QPU")
     parser.add_argument("--hardware", action="store_true", help="Run on IBM hardware")
     parser.add_argument("--backend", default=DEFAULT_BACKEND, help="Backend name")
     parser.add_argument("--trials", type=int, default=DEFAULT_TRIALS, help="Repeat count")
-    parser.add_argument("--shots", type=int, default=DEFAULT_SHOTS, help="Shots per job")
+    parser.add_argument("--shots", type=int, default=DEFAULT_SHOTS, help="Shots per trial")
     cli = parser.parse_args()
 
     run(cli.trials, cli.shots, hw=cli.hardware, backend_name=cli.backend)